@@ -1,39 +1,21 @@
 """Retrieve NBA draft data from Basketball Reference."""
 from __future__ import annotations
 
-import time
-
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-
-DRAFT_URL_TEMPLATE = "https://www.basketball-reference.com/draft/NBA_{season_end}.html"
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
-    "Referer": "https://www.basketball-reference.com/"
-}
+from bs4 import BeautifulSoup, SoupStrainer
 
+from http_session import request_with_retry
 
-def _request_with_retry(url: str, max_attempts: int = 6, backoff: float = 1.5) -> requests.Response | None:
-    delay = 1.5
-    for _ in range(max_attempts):
-        time.sleep(delay)
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        if response.status_code == 429:
-            delay = min(delay * backoff, 8.0)
-            continue
-        if response.ok:
-            return response
-        delay = min(delay * backoff, 8.0)
-    return None
+DRAFT_URL_TEMPLATE = "https://www.basketball-reference.com/draft/NBA_{season_end}.html"
 
 
 def fetch_draft_class(season_end: int) -> pd.DataFrame:
     """Return draft picks for a given draft year (season_end)."""
-    response = _request_with_retry(DRAFT_URL_TEMPLATE.format(season_end=season_end))
+    response = request_with_retry(DRAFT_URL_TEMPLATE.format(season_end=season_end))
     if response is None:
         return pd.DataFrame(columns=["season_end", "pick", "team", "player_name", "player_slug"])
-    soup = BeautifulSoup(response.text, "html.parser")
+    # Only the target table is needed; skip building a tree for the rest of the page.
+    soup = BeautifulSoup(response.text, "lxml", parse_only=SoupStrainer("table", id="stats"))
     table = soup.find("table", id="stats")
     if table is None:
         return pd.DataFrame(columns=["season_end", "pick", "team", "player_name", "player_slug"])
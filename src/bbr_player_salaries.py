@@ -2,19 +2,23 @@
 from __future__ import annotations
 
 import re
+import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
 
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup, Comment
 
+from html_tables import table_cells
+from http_session import CACHE_EXPIRE_AFTER, cached_urls, evict_cached, request_with_retry
+
 PLAYER_URL_TEMPLATE = "https://www.basketball-reference.com/players/{first}/{slug}.html"
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
-    "Referer": "https://www.basketball-reference.com/"
-}
+PLAYER_URL_PREFIX = PLAYER_URL_TEMPLATE.split("{", 1)[0]
 MONEY_RE = re.compile(r"[^0-9.]")
+CACHE_DIR = Path("data") / "cache" / "player_salaries"
 
 
 def _clean_salary(value: str) -> float:
@@ -26,40 +30,28 @@ def _clean_salary(value: str) -> float:
     return float(cleaned)
 
 
-def _request_with_retry(url: str, max_attempts: int = 6, backoff: float = 1.4) -> requests.Response | None:
-    delay = 1.0
-    for _ in range(max_attempts):
-        time.sleep(delay)
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        if response.status_code == 429:
-            delay = min(delay * backoff, 8.0)
-            continue
-        if response.ok:
-            return response
-        delay = min(delay * backoff, 8.0)
-    return None
+def _player_url(slug: str) -> str:
+    return PLAYER_URL_TEMPLATE.format(first=slug[0], slug=slug)
 
 
-@lru_cache(maxsize=None)
-def fetch_player_salaries(slug: str) -> pd.DataFrame:
-    if not slug or len(slug) < 1:
-        return pd.DataFrame(columns=["player_slug", "season_end", "salary"])
-    first_letter = slug[0]
-    url = PLAYER_URL_TEMPLATE.format(first=first_letter, slug=slug)
-    response = _request_with_retry(url)
+def _scrape_player_salaries(slug: str) -> pd.DataFrame | None:
+    """Scrape a player's salary table; None means the page could not be fetched."""
+    url = _player_url(slug)
+    response = request_with_retry(url)
     if response is None:
-        return pd.DataFrame(columns=["player_slug", "season_end", "salary"])
-    soup = BeautifulSoup(response.text, "html.parser")
+        return None
+    soup = BeautifulSoup(response.text, "lxml")
     salary_table_html = None
     for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
         if "id=\"all_salaries\"" in comment:
-            salary_table_html = BeautifulSoup(comment, "html.parser").find("table")
+            salary_table_html = BeautifulSoup(comment, "lxml").find("table")
             break
     if salary_table_html is None:
         return pd.DataFrame(columns=["player_slug", "season_end", "salary"])
-    df = pd.read_html(str(salary_table_html))[0]
-    if "Season" not in df.columns or "Salary" not in df.columns:
+    headers, rows = table_cells(salary_table_html)
+    if "Season" not in headers or "Salary" not in headers:
         return pd.DataFrame(columns=["player_slug", "season_end", "salary"])
+    df = pd.DataFrame([row for row in rows if len(row) == len(headers)], columns=headers)
     df = df[df["Season"].astype(str).str.contains("-")]
 
     def season_to_end(season: str) -> int:
@@ -76,4 +68,49 @@ def fetch_player_salaries(slug: str) -> pd.DataFrame:
     return df[["player_slug", "season_end", "salary"]]
 
 
-__all__ = ["fetch_player_salaries"]
+@lru_cache(maxsize=None)
+def fetch_player_salaries(slug: str) -> pd.DataFrame:
+    if not slug or len(slug) < 1:
+        return pd.DataFrame(columns=["player_slug", "season_end", "salary"])
+    # Drafted players keep signing contracts, so the per-player copy expires along with the HTTP cache
+    # entry it was scraped from; clear_player_salary_cache() forces an earlier re-scrape.
+    cache_path = CACHE_DIR / f"{slug}.csv"
+    if cache_path.exists() and time.time() - cache_path.stat().st_mtime < CACHE_EXPIRE_AFTER.total_seconds():
+        return pd.read_csv(cache_path, dtype={"player_slug": str, "season_end": int, "salary": float})
+    df = _scrape_player_salaries(slug)
+    if df is None:
+        return pd.DataFrame(columns=["player_slug", "season_end", "salary"])
+    # A page without a salary table (e.g. a stashed draftee) is not persisted, so it is retried next run.
+    if not df.empty:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        df.to_csv(cache_path, index=False)
+    return df
+
+
+def fetch_player_salaries_bulk(slugs: Iterable[str], workers: int = 8) -> pd.DataFrame:
+    """Fetch salary histories for many players concurrently."""
+    unique_slugs = list(dict.fromkeys(slugs))
+    frames = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(fetch_player_salaries, slug) for slug in unique_slugs]
+        for slug, future in zip(unique_slugs, futures):
+            try:
+                frames.append(future.result())
+            except Exception as exc:  # noqa: BLE001
+                print(f"WARN: failed fetching salaries for {slug}: {exc}")
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=["player_slug", "season_end", "salary"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def clear_player_salary_cache() -> None:
+    """Drop the in-process, on-disk and HTTP caches so the next fetch re-scrapes each player."""
+    fetch_player_salaries.cache_clear()
+    # Pages without a salary table leave no CSV behind, so evict by URL rather than by cached slug.
+    evict_cached(url for url in cached_urls() if url.startswith(PLAYER_URL_PREFIX))
+    if CACHE_DIR.exists():
+        shutil.rmtree(CACHE_DIR)
+
+
+__all__ = ["clear_player_salary_cache", "fetch_player_salaries", "fetch_player_salaries_bulk"]
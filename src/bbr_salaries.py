@@ -2,27 +2,27 @@
 from __future__ import annotations
 
 import re
+from io import StringIO
 from typing import Sequence
 
 import pandas as pd
-import requests
+
+from http_session import request_with_retry
 
 CONTRACTS_URL = "https://www.basketball-reference.com/contracts/players.html"
 SEASON_RE = re.compile(r"^\d{4}-\d{2}$")
 NON_NUMERIC_RE = re.compile(r"[^0-9.]")
 
 
+def _is_label(name: str) -> bool:
+    return bool(name) and not name.startswith("Unnamed")
+
+
 def _flatten_columns(columns: Sequence[tuple[str, str]]) -> list[str]:
-    flat = []
-    for top, bottom in columns:
-        pieces = []
-        if top and not top.startswith("Unnamed"):
-            pieces.append(top)
-        if bottom and not bottom.startswith("Unnamed"):
-            pieces.append(bottom)
-        flat_name = "_".join(pieces)
-        flat.append(flat_name if flat_name else bottom)
-    return flat
+    return [
+        f"{top}_{bottom}" if _is_label(top) and _is_label(bottom) else top if _is_label(top) else bottom
+        for top, bottom in columns
+    ]
 
 
 def _clean_salary(value: str) -> float:
@@ -42,9 +42,8 @@ def _clean_salary(value: str) -> float:
 
 def fetch_player_contracts() -> pd.DataFrame:
     """Return the full player contracts table in long form."""
-    response = requests.get(CONTRACTS_URL, timeout=30)
-    response.raise_for_status()
-    tables = pd.read_html(response.text, header=[0, 1])
+    response = request_with_retry(CONTRACTS_URL, raise_on_failure=True)
+    tables = pd.read_html(StringIO(response.text), header=[0, 1])
     raw = tables[0]
     raw.columns = _flatten_columns(raw.columns)
     season_columns: Sequence[str] = [c for c in raw.columns if SEASON_RE.match(c.split("_")[-1])]
@@ -62,7 +61,12 @@ def fetch_player_contracts() -> pd.DataFrame:
     if player_col is None or team_col is None:
         raise ValueError("Expected player/team columns not found in contracts table")
     df = df.rename(columns={player_col: "player", team_col: "team"})
-    df["salary"] = df["salary"].apply(_clean_salary)
+    # Placeholder text becomes 0.0, but cells read_html left empty (no contract that season) stay NaN.
+    df["salary"] = (
+        pd.to_numeric(df["salary"].astype(str).str.replace(NON_NUMERIC_RE, "", regex=True), errors="coerce")
+        .fillna(0.0)
+        .where(df["salary"].notna())
+    )
     df["season_start"] = df["season"].str.slice(0, 4).astype(int)
     return df[["player", "team", "season", "season_start", "salary"]]
 
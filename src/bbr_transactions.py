@@ -6,9 +6,10 @@ from dataclasses import dataclass
 from typing import Iterable, List
 
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 
+from http_session import request_with_retry
+
 TRANSACTIONS_URL = "https://www.basketball-reference.com/leagues/NBA_{season}_transactions.html"
 FREE_AGENT_PATTERN = re.compile(r"signed as a free agent", re.IGNORECASE)
 
@@ -23,10 +24,17 @@ class FreeAgentSigning:
 
 def _extract_signing_rows(soup: BeautifulSoup) -> Iterable[str]:
     """Yield transaction text snippets that look like free-agent signings."""
-    for paragraph in soup.select("#content p"):
-        text = paragraph.get_text(" ", strip=True)
-        if FREE_AGENT_PATTERN.search(text):
-            yield text
+    content = soup.find(id="content")
+    if content is None:
+        return
+    # Match against the text leaves first so only signing paragraphs are flattened.
+    seen: set[int] = set()
+    for text_node in content.find_all(string=FREE_AGENT_PATTERN):
+        paragraph = text_node.find_parent("p")
+        if paragraph is None or id(paragraph) in seen:
+            continue
+        seen.add(id(paragraph))
+        yield paragraph.get_text(" ", strip=True)
 
 
 def _parse_signing_text(text: str, season_end: int) -> FreeAgentSigning | None:
@@ -53,9 +61,8 @@ def get_free_agent_signings(season_end: int) -> pd.DataFrame:
     Example: season_end=2024 captures summer 2023 signings.
     """
     url = TRANSACTIONS_URL.format(season=season_end)
-    response = requests.get(url, timeout=30)
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, "html.parser")
+    response = request_with_retry(url, raise_on_failure=True)
+    soup = BeautifulSoup(response.text, "lxml")
     signings: List[FreeAgentSigning] = []
     for text in _extract_signing_rows(soup):
         record = _parse_signing_text(text, season_end)
@@ -1,42 +1,21 @@
 """Utilities for grabbing season-level Win Shares from Basketball Reference."""
 from __future__ import annotations
 
-import time
-
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-
-ADVANCED_URL_TEMPLATE = "https://www.basketball-reference.com/leagues/NBA_{season_end}_advanced.html"
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
-    "Referer": "https://www.basketball-reference.com/"
-}
+from bs4 import BeautifulSoup, SoupStrainer
 
+from http_session import request_with_retry
 
-def _request_with_retry(url: str, max_attempts: int = 7, backoff: float = 1.6) -> requests.Response:
-    delay = 2.0
-    last_response: requests.Response | None = None
-    for _ in range(max_attempts):
-        time.sleep(delay)
-        response = requests.get(url, headers=HEADERS, timeout=60)
-        last_response = response
-        if response.status_code == 429:
-            delay = min(delay * backoff, 10.0)
-            continue
-        if response.ok:
-            return response
-        delay = min(delay * backoff, 10.0)
-    if last_response is None:
-        raise RuntimeError(f"Failed to fetch {url}")
-    last_response.raise_for_status()
-    return last_response
+ADVANCED_URL_TEMPLATE = "https://www.basketball-reference.com/leagues/NBA_{season_end}_advanced.html"
 
 
 def fetch_season_win_shares(season_end: int) -> pd.DataFrame:
     """Return a dataframe of player win shares for a given season."""
-    response = _request_with_retry(ADVANCED_URL_TEMPLATE.format(season_end=season_end))
-    soup = BeautifulSoup(response.text, "html.parser")
+    response = request_with_retry(
+        ADVANCED_URL_TEMPLATE.format(season_end=season_end), timeout=60, raise_on_failure=True
+    )
+    # Only the target table is needed; skip building a tree for the rest of the page.
+    soup = BeautifulSoup(response.text, "lxml", parse_only=SoupStrainer("table", id="advanced"))
     table = soup.find("table", id="advanced")
     if table is None:
         raise ValueError(f"Advanced stats table not found for season {season_end}")
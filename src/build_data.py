@@ -2,119 +2,137 @@
 from __future__ import annotations
 
 import json
-import re
-import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable
 
+import numpy as np
 import pandas as pd
 
 from bbr_draft import fetch_draft_class
+from names import canonicalize_series
+from table_io import read_table, write_table
 
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
 
 RAPTOR_PATH = DATA_DIR / "modern_RAPTOR_by_player.csv"
-SALARY_PATH = DATA_DIR / "player_salary.csv"
+SALARY_PATH = DATA_DIR / "player_salary"
+SALARY_COLUMNS = ["player", "canonical_name", "season_end", "salary"]
 
+# Persists a built table; the default writes synchronously, `main` swaps in a background writer.
+TableWriter = Callable[[pd.DataFrame, Path], object]
 
-def _canonicalize(name: str) -> str:
-    if not isinstance(name, str):
-        return ""
-    name = unicodedata.normalize("NFKD", name)
-    name = "".join(ch for ch in name if not unicodedata.combining(ch))
-    name = name.replace(".", "").replace(",", "").replace("'", "")
-    name = name.replace("-", " ")
-    name = re.sub(r"\b(jr|sr|ii|iii|iv|v)\b", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"[^a-zA-Z0-9 ]", "", name)
-    name = re.sub(r"\s+", " ", name).strip().lower()
-    return name
 
-
-def load_war_data(start_season: int = 2017, end_season: int = 2024) -> pd.DataFrame:
-    war = pd.read_csv(RAPTOR_PATH)
+def load_war_data(start_season: int = 2017, end_season: int = 2024, write: TableWriter = write_table) -> pd.DataFrame:
+    war = pd.read_csv(
+        RAPTOR_PATH,
+        usecols=["player_id", "player_name", "season", "war_total"],
+        dtype={"player_id": str, "player_name": str, "season": "int64", "war_total": "float64"},
+    )
     war = war.rename(columns={"player_id": "player_slug", "season": "season_end", "war_total": "war"})
-    war["season_end"] = war["season_end"].astype(int)
-    war = war[(war["season_end"] >= start_season) & (war["season_end"] <= end_season)]
-    war["canonical_name"] = war["player_name"].apply(_canonicalize)
+    war = war[war["season_end"].between(start_season, end_season)].copy()
+    war["canonical_name"] = canonicalize_series(war["player_name"])
     war = war[["player_slug", "player_name", "canonical_name", "season_end", "war"]]
-    war.to_csv(DATA_DIR / "player_war.csv", index=False)
+    write(war, DATA_DIR / "player_war")
     return war
 
 
-def load_salary_data(start_season: int = 2016, end_season: int = 2024) -> pd.DataFrame:
-    salary = pd.read_csv(SALARY_PATH)
+def load_salary_data(start_season: int = 2016, end_season: int = 2024, write: TableWriter = write_table) -> pd.DataFrame:
+    salary = read_table(
+        SALARY_PATH,
+        columns=SALARY_COLUMNS,
+        dtype={"player": str, "canonical_name": str, "season_end": "int64", "salary": "float64"},
+    )
+    salary = salary[salary["season_end"].between(start_season, end_season)].copy()
     if "canonical_name" not in salary.columns:
-        salary["canonical_name"] = salary["player"].apply(_canonicalize)
-    salary["season_end"] = salary["season_end"].astype(int)
-    salary = salary[(salary["season_end"] >= start_season) & (salary["season_end"] <= end_season)]
+        salary["canonical_name"] = canonicalize_series(salary["player"])
     salary = salary.groupby(["canonical_name", "season_end"], as_index=False)["salary"].max()
-    salary.to_csv(DATA_DIR / "player_salary_clean.csv", index=False)
+    write(salary, DATA_DIR / "player_salary_clean")
     return salary
 
 
-def build_draft_data(start_draft_year: int = 2016, end_draft_year: int = 2020) -> pd.DataFrame:
+def build_draft_data(
+    start_draft_year: int = 2016,
+    end_draft_year: int = 2020,
+    max_workers: int = 5,
+    write: TableWriter = write_table,
+) -> pd.DataFrame:
+    seasons = range(start_draft_year, end_draft_year + 1)
     frames: list[pd.DataFrame] = []
-    for season_end in range(start_draft_year, end_draft_year + 1):
-        try:
-            df = fetch_draft_class(season_end)
-            frames.append(df)
-        except Exception as exc:  # noqa: BLE001
-            print(f"WARN: failed to fetch draft {season_end}: {exc}")
+    # Draft pages are independent, so overlap the network waits instead of fetching serially.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fetch_draft_class, season_end) for season_end in seasons]
+        for season_end, future in zip(seasons, futures):
+            try:
+                frames.append(future.result())
+            except Exception as exc:  # noqa: BLE001
+                print(f"WARN: failed to fetch draft {season_end}: {exc}")
     if not frames:
         raise RuntimeError("No draft data fetched")
     draft = pd.concat(frames, ignore_index=True)
-    draft["canonical_name"] = draft["player_name"].apply(_canonicalize)
-    draft.to_csv(DATA_DIR / "draft_classes.csv", index=False)
+    draft["canonical_name"] = canonicalize_series(draft["player_name"])
+    write(draft, DATA_DIR / "draft_classes")
     return draft
 
 
-def build_salary_market(war: pd.DataFrame, salary: pd.DataFrame) -> pd.DataFrame:
+def build_salary_market(war: pd.DataFrame, salary: pd.DataFrame, write: TableWriter = write_table) -> pd.DataFrame:
     market = war.merge(salary, on=["canonical_name", "season_end"], how="inner")
     market = market[market["war"] > 0]
-    market.to_csv(DATA_DIR / "salary_market_raw.csv", index=False)
+    write(market, DATA_DIR / "salary_market_raw")
     return market
 
 
+def _sum_by_season(
+    values: pd.DataFrame,
+    key: str,
+    column: str,
+    keys: pd.Series,
+    seasons: np.ndarray,
+    rookie_years: int,
+) -> np.ndarray:
+    """Sum `column` over each key's block of `rookie_years` seasons via one MultiIndex reindex."""
+    lookup = values.set_index([key, "season_end"])[column]
+    lookup = lookup[~lookup.index.duplicated(keep="last")]
+    index = pd.MultiIndex.from_arrays([np.repeat(keys.to_numpy(), rookie_years), seasons])
+    return lookup.reindex(index, fill_value=0.0).to_numpy().reshape(-1, rookie_years).sum(axis=1)
+
+
 def build_pick_outcomes(
     draft: pd.DataFrame,
     war: pd.DataFrame,
     salary: pd.DataFrame,
     rookie_years: int = 4,
+    write: TableWriter = write_table,
 ) -> pd.DataFrame:
-    war_lookup = war.set_index(["player_slug", "season_end"])["war"].to_dict()
-    salary_lookup = salary.set_index(["canonical_name", "season_end"])["salary"].to_dict()
-    rows = []
-    for _, pick in draft.iterrows():
-        slug = pick["player_slug"]
-        canonical = pick["canonical_name"]
-        draft_year = int(pick["season_end"])
-        war_sum = 0.0
-        cost_sum = 0.0
-        for season_end in range(draft_year + 1, draft_year + 1 + rookie_years):
-            war_sum += war_lookup.get((slug, season_end), 0.0)
-            cost_sum += salary_lookup.get((canonical, season_end), 0.0)
-        rows.append(
-            {
-                "draft_year": draft_year,
-                "pick": int(pick["pick"]),
-                "player_slug": slug,
-                "player_name": pick["player_name"],
-                "canonical_name": canonical,
-                "war_first4": war_sum,
-                "cost_first4": cost_sum,
-            }
-        )
-    df = pd.DataFrame(rows)
-    df.to_csv(DATA_DIR / "pick_outcomes_first4.csv", index=False)
+    picks = draft.rename(columns={"season_end": "draft_year"})[
+        ["draft_year", "pick", "player_slug", "player_name", "canonical_name"]
+    ].reset_index(drop=True)
+    picks = picks.astype({"draft_year": int, "pick": int})
+    # (pick, rookie season) keys, one row of `rookie_years` seasons per pick.
+    seasons = (picks["draft_year"].to_numpy()[:, None] + np.arange(1, rookie_years + 1)).ravel()
+    war_first4 = _sum_by_season(war, "player_slug", "war", picks["player_slug"], seasons, rookie_years)
+    cost_first4 = _sum_by_season(salary, "canonical_name", "salary", picks["canonical_name"], seasons, rookie_years)
+    df = picks.assign(war_first4=war_first4, cost_first4=cost_first4)
+    write(df, DATA_DIR / "pick_outcomes_first4")
     return df
 
 
 def main() -> None:
-    war = load_war_data()
-    salary = load_salary_data()
-    draft = build_draft_data()
-    market = build_salary_market(war, salary)
-    picks = build_pick_outcomes(draft, war, salary)
+    # Table writes run on a small I/O pool so the next build step can start while the last one is saved.
+    with ThreadPoolExecutor(max_workers=2) as io_pool:
+        pending: list[Future] = []
+
+        def write(df: pd.DataFrame, path: Path) -> None:
+            pending.append(io_pool.submit(write_table, df, path))
+
+        war = load_war_data(write=write)
+        salary = load_salary_data(write=write)
+        draft = build_draft_data(write=write)
+        market = build_salary_market(war, salary, write=write)
+        picks = build_pick_outcomes(draft, war, salary, write=write)
+        for future in pending:
+            future.result()
     summary = {
         "war_rows": len(war),
         "salary_rows": len(salary),
@@ -1,14 +1,16 @@
-"""Scrape RealGM roster salaries into data/player_salary.csv."""
+"""Scrape RealGM roster salaries into data/player_salary (Parquet, or CSV without pyarrow)."""
 from __future__ import annotations
 
 import re
-import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import StringIO
 from pathlib import Path
 from typing import Dict, Iterable
 
 import pandas as pd
-import requests
+
+from http_session import request_with_retry
+from table_io import write_table
 
 TEAM_INFO: Dict[str, tuple[int, str]] = {
     "ATL": (1, "atlanta-hawks"),
@@ -49,6 +51,8 @@ HEADERS = {
     "Referer": "https://basketball.realgm.com/",
 }
 MONEY_RE = re.compile(r"[^0-9.]")
+# Stays within http_session.POOL_SIZE so every worker keeps its own pooled connection.
+MAX_WORKERS = 24
 
 
 def _clean_money(value: str) -> float:
@@ -61,51 +65,58 @@ def _clean_money(value: str) -> float:
 def _fetch_team_table(season_end: int, abbr: str) -> pd.DataFrame:
     team_id, slug = TEAM_INFO[abbr]
     url = BASE_URL.format(slug=slug, tid=team_id, season_end=season_end)
-    response = requests.get(url, headers=HEADERS, timeout=30)
-    response.raise_for_status()
-    tables = pd.read_html(response.text)
+    response = request_with_retry(url, headers=HEADERS, raise_on_failure=True)
+    tables = pd.read_html(StringIO(response.text))
     table = next((df for df in tables if {"Player", "Salary"}.issubset(df.columns)), None)
     if table is None:
         return pd.DataFrame(columns=["player", "season_end", "salary"])
     cleaned = table.rename(columns={"Player": "player"}).copy()
-    cleaned["salary"] = cleaned["Salary"].astype(str).map(_clean_money)
+    cleaned["salary"] = pd.to_numeric(
+        cleaned["Salary"].astype(str).str.replace(MONEY_RE, "", regex=True), errors="coerce"
+    ).fillna(0.0)
     cleaned["player"] = cleaned["player"].astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
     cleaned["season_end"] = season_end
     return cleaned[["player", "season_end", "salary"]]
 
 
-def fetch_league_salaries(season_end: int) -> pd.DataFrame:
-    with ThreadPoolExecutor(max_workers=8) as executor:
-        futures = {executor.submit(_fetch_team_table, season_end, abbr): abbr for abbr in TEAM_INFO}
+def fetch_salaries(seasons: Iterable[int]) -> pd.DataFrame:
+    """Scrape every team roster for every season in `seasons` from one shared pool."""
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(_fetch_team_table, season_end, abbr): (season_end, abbr)
+            for season_end in seasons
+            for abbr in TEAM_INFO
+        }
         frames = []
         for future in as_completed(futures):
             try:
                 frames.append(future.result())
             except Exception as exc:  # noqa: BLE001
-                print(f"WARN: failed fetching salaries for {season_end} {futures[future]}: {exc}")
+                season_end, abbr = futures[future]
+                print(f"WARN: failed fetching salaries for {season_end} {abbr}: {exc}")
     if not frames:
         return pd.DataFrame(columns=["player", "season_end", "salary"])
     league = pd.concat(frames, ignore_index=True)
     if league.empty:
         return league
     # Players may appear multiple times (trades/10-days). Take the max salary reported for the season.
-    league = league.groupby(["player", "season_end"], as_index=False)["salary"].max()
-    return league
+    league = league.groupby(["season_end", "player"], as_index=False)["salary"].max()
+    return league[["player", "season_end", "salary"]]
+
+
+def fetch_league_salaries(season_end: int) -> pd.DataFrame:
+    return fetch_salaries([season_end])
 
 
 def main(start_season: int = 2016, end_season: int = 2024) -> None:
-    out_frames = []
-    for season_end in range(start_season, end_season + 1):
-        print(f"Fetching salaries for {season_end}...")
-        df = fetch_league_salaries(season_end)
-        out_frames.append(df)
-        time.sleep(0.6)  # gentle pacing
-    all_salaries = pd.concat(out_frames, ignore_index=True) if out_frames else pd.DataFrame(
-        columns=["player", "season_end", "salary"]
-    )
-    output_path = Path("data") / "player_salary.csv"
+    print(f"Fetching salaries for {start_season}-{end_season}...")
+    all_salaries = fetch_salaries(range(start_season, end_season + 1))
+    if all_salaries.empty:
+        # An empty table would shadow the committed CSV snapshot, since readers pick the newer file.
+        raise RuntimeError("No RealGM salaries fetched; leaving data/player_salary untouched")
+    output_path = Path("data") / "player_salary"
     output_path.parent.mkdir(exist_ok=True)
-    all_salaries.to_csv(output_path, index=False)
+    output_path = write_table(all_salaries, output_path)
     print(f"Wrote {len(all_salaries):,} rows to {output_path}")
 
 
@@ -0,0 +1,20 @@
+"""Helpers for reading Basketball Reference HTML tables."""
+from __future__ import annotations
+
+from bs4 import Tag
+
+
+def table_cells(table: Tag) -> tuple[list[str], list[list[str]]]:
+    """Return the header labels and body cell text of an HTML table."""
+    header_rows = table.thead.find_all("tr") if table.thead is not None else table.find_all("tr")[:1]
+    headers = [cell.get_text(strip=True) for cell in header_rows[-1].find_all(["th", "td"])] if header_rows else []
+    body = table.tbody if table.tbody is not None else table
+    rows = [
+        [cell.get_text(strip=True) for cell in tr.find_all(["th", "td"])]
+        for tr in body.find_all("tr")
+        if "thead" not in (tr.get("class") or [])
+    ]
+    return headers, [row for row in rows if row != headers]
+
+
+__all__ = ["table_cells"]
@@ -0,0 +1,169 @@
+"""Shared HTTP session used by the Basketball Reference and RealGM scrapers."""
+from __future__ import annotations
+
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Iterable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import requests_cache
+except ImportError:  # the on-disk response cache is optional
+    requests_cache = None
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Referer": "https://www.basketball-reference.com/"
+}
+# Keep at least as large as the biggest scraper thread pool so workers never wait on a connection.
+POOL_SIZE = 32
+MAX_RETRY_AFTER = 60.0
+
+CACHE_PATH = Path("data") / "http_cache.sqlite"
+CACHE_EXPIRE_AFTER = timedelta(days=30)
+NEVER_EXPIRE = -1
+FIRST_SEASON = 1947
+
+
+def last_completed_season(today: date | None = None) -> int:
+    """Return the latest season_end whose playoffs and draft are over (both finish by July)."""
+    today = today or date.today()
+    return today.year if today.month >= 7 else today.year - 1
+
+
+def _completed_season_expirations(last_season: int) -> dict[re.Pattern[str], int]:
+    """Never expire draft and advanced-stat pages of completed seasons; they are not revised."""
+    seasons = "|".join(str(season) for season in range(FIRST_SEASON, last_season + 1))
+    return {
+        re.compile(rf".*/draft/NBA_(?:{seasons})\.html"): NEVER_EXPIRE,
+        re.compile(rf".*/leagues/NBA_(?:{seasons})_advanced\.html"): NEVER_EXPIRE,
+    }
+
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    if requests_cache is None:
+        session = requests.Session()
+    else:
+        CACHE_PATH.parent.mkdir(exist_ok=True)
+        session = requests_cache.CachedSession(
+            str(CACHE_PATH),
+            backend="sqlite",
+            allowable_methods=["GET"],
+            expire_after=CACHE_EXPIRE_AFTER,
+            # In-progress and future seasons fall through to CACHE_EXPIRE_AFTER.
+            urls_expire_after=_completed_season_expirations(last_completed_season()),
+            stale_if_error=True,
+        )
+    session.headers.update(HEADERS)
+    # Retries are handled by the callers; the adapter only provides connection pooling.
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _is_cached(session: requests.Session, url: str) -> bool:
+    cache = getattr(session, "cache", None)
+    return cache is not None and cache.contains(url=url)
+
+
+def cached_urls() -> list[str]:
+    """Return every URL currently held in the response cache (empty without requests_cache)."""
+    cache = getattr(get_session(), "cache", None)
+    return cache.urls() if cache is not None else []
+
+
+def evict_cached(urls: Iterable[str]) -> None:
+    """Drop `urls` from the response cache so their next request goes to the network."""
+    cache = getattr(get_session(), "cache", None)
+    if cache is not None:
+        cache.delete(urls=list(urls))
+
+
+def _retry_after_seconds(response: requests.Response) -> float | None:
+    """Return the wait requested by a `Retry-After` header (seconds or HTTP date)."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def request_with_retry(
+    url: str,
+    *,
+    max_attempts: int = 6,
+    base_delay: float = 1.0,
+    backoff: float = 1.5,
+    cap: float = 8.0,
+    timeout: float = 30,
+    headers: dict[str, str] | None = None,
+    raise_on_failure: bool = False,
+    refresh: bool = False,
+) -> requests.Response | None:
+    """GET `url` with pacing, retrying 429 and 5xx responses and honoring `Retry-After` on 429s.
+
+    `refresh` bypasses the response cache and stores the fresh response in its place.
+    Returns None once attempts are exhausted unless `raise_on_failure` is set.
+    """
+    session = get_session()
+    get_kwargs = {"force_refresh": True} if refresh and getattr(session, "cache", None) is not None else {}
+    # Cached pages never touch the network, so they skip the politeness delay.
+    delay = 0.0 if not refresh and _is_cached(session, url) else base_delay
+    last_response: requests.Response | None = None
+    for _ in range(max_attempts):
+        time.sleep(delay)
+        response = session.get(url, headers=headers, timeout=timeout, **get_kwargs)
+        last_response = response
+        if response.ok:
+            return response
+        if response.status_code < 500 and response.status_code != 429:
+            # Other 4xx (missing or forbidden pages) will not change on retry, so fail fast.
+            break
+        retry_after = _retry_after_seconds(response) if response.status_code == 429 else None
+        if retry_after is None:
+            # Jitter keeps concurrent workers that were throttled together from retrying in lockstep.
+            delay = min(max(delay, base_delay) * backoff * random.uniform(0.5, 1.5), cap)
+        elif retry_after > MAX_RETRY_AFTER:
+            break
+        else:
+            delay = retry_after * random.uniform(1.0, 1.25)
+    if not raise_on_failure:
+        return None
+    if last_response is None:
+        raise RuntimeError(f"Failed to fetch {url}")
+    last_response.raise_for_status()
+    return last_response
+
+
+__all__ = ["HEADERS", "cached_urls", "evict_cached", "get_session", "last_completed_season", "request_with_retry"]
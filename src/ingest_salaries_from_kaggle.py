@@ -1,17 +1,19 @@
-"""Convert Kaggle NBA salaries CSV to data/player_salary.csv."""
+"""Convert Kaggle NBA salaries CSV to data/player_salary (Parquet, or CSV without pyarrow)."""
 from __future__ import annotations
 
 import re
-import unicodedata
 from pathlib import Path
 
 import pandas as pd
 
+from names import canonicalize_series
+from table_io import write_table
+
 CANDIDATE_PATHS = [
     Path("data") / "kaggle_nba_salaries.csv",
     Path("data") / "NBA Player Salaries_2000-2025.csv",
 ]
-OUTPUT_PATH = Path("data") / "player_salary.csv"
+OUTPUT_PATH = Path("data") / "player_salary"
 MONEY_RE = re.compile(r"[^0-9.]")
 
 
@@ -22,19 +24,6 @@ def _clean_salary(value: str) -> float:
     return float(cleaned) if cleaned else 0.0
 
 
-def _canonicalize(name: str) -> str:
-    if not isinstance(name, str):
-        return ""
-    name = unicodedata.normalize("NFKD", name)
-    name = "".join(ch for ch in name if not unicodedata.combining(ch))
-    name = name.replace(".", "").replace(",", "").replace("'", "")
-    name = name.replace("-", " ")
-    name = re.sub(r"\b(jr|sr|ii|iii|iv|v)\b", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"[^a-zA-Z0-9 ]", "", name)
-    name = re.sub(r"\s+", " ", name).strip().lower()
-    return name
-
-
 def _find_input_file() -> Path:
     for path in CANDIDATE_PATHS:
         if path.exists():
@@ -51,11 +40,11 @@ def main() -> None:
     df["player"] = df["player"].astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
     df["season_end"] = df["season"].astype(str).str.slice(0, 4).astype(int)
     df["salary"] = df["salary"].astype(str).map(_clean_salary)
-    df["canonical_name"] = df["player"].apply(_canonicalize)
+    df["canonical_name"] = canonicalize_series(df["player"])
     df = df[["player", "canonical_name", "season_end", "salary"]]
     OUTPUT_PATH.parent.mkdir(exist_ok=True)
-    df.to_csv(OUTPUT_PATH, index=False)
-    print(f"Using {input_path.name}; wrote {len(df):,} rows to {OUTPUT_PATH}")
+    output_path = write_table(df, OUTPUT_PATH)
+    print(f"Using {input_path.name}; wrote {len(df):,} rows to {output_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,24 @@
+"""Player name canonicalization shared by the data builders."""
+from __future__ import annotations
+
+import re
+
+import pandas as pd
+
+PUNCT_RE = re.compile(r"[.,']")
+SUFFIX_RE = re.compile(r"\b(jr|sr|ii|iii|iv|v)\b", re.IGNORECASE)
+NON_ALNUM_RE = re.compile(r"[^a-zA-Z0-9 ]")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def canonicalize_series(names: pd.Series) -> pd.Series:
+    """Return the lowercase ASCII join key for each name, without punctuation or suffixes."""
+    s = names.astype("string").fillna("")
+    s = s.str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+    s = s.str.replace(PUNCT_RE, "", regex=True).str.replace("-", " ", regex=False)
+    s = s.str.replace(SUFFIX_RE, "", regex=True)
+    s = s.str.replace(NON_ALNUM_RE, "", regex=True)
+    return s.str.replace(WHITESPACE_RE, " ", regex=True).str.strip().str.lower().astype(object)
+
+
+__all__ = ["canonicalize_series"]
@@ -1,13 +1,22 @@
 ﻿"""Compute pricing bands, pick costs, and arbitrage map outputs."""
 from __future__ import annotations
 
+import argparse
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Literal, Optional, List
+from typing import Callable, Dict, Literal, Optional, List, Tuple, TypeVar
 
-import matplotlib.pyplot as plt
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
 import numpy as np
 import pandas as pd
 
+from table_io import read_cached_table, read_table, resolve_table, write_cached_table
+
 DATA_DIR = Path("data")
 FIG_DIR = Path("figs")
 TABLE_DIR = Path("tables")
@@ -18,36 +27,75 @@ TABLE_DIR.mkdir(exist_ok=True)
 PickBucket = Literal["01-05", "06-10", "11-20", "21-30", "31-45", "46-60"]
 
 ZONE_COLORS = {"BUY": "#1b9e77", "NEUTRAL": "#9e9e9e", "SELL": "#d95f02"}
+ZONES = list(ZONE_COLORS)
 ZONE_TEXT_COLORS = {"BUY": "#0c4c33", "NEUTRAL": "#4b4b4b", "SELL": "#7f2704"}
 BASELINE_BAND_FILL = "#cdd1ff"
 SCENARIO_BAND_FILL = "#90a0ff"
 SCENARIO_LINE_COLOR = "#263bd6"
 BASELINE_LINE_COLOR = "#6b70c3"
 PICK_LINE_COLOR = "#0b5bc4"
+FIG_DPI = 120
+# Fast zlib level: the PNGs are regenerated every run, so encode time matters more than size.
+FIG_SAVE_KWARGS = {"dpi": FIG_DPI, "pil_kwargs": {"compress_level": 1}}
 
 ORDER = ["01-05", "06-10", "11-20", "21-30", "31-45", "46-60"]
 
 
-def assign_bucket(slot: int) -> PickBucket:
-    if 1 <= slot <= 5:
-        return "01-05"
-    if 6 <= slot <= 10:
-        return "06-10"
-    if 11 <= slot <= 20:
-        return "11-20"
-    if 21 <= slot <= 30:
-        return "21-30"
-    if 31 <= slot <= 45:
-        return "31-45"
+BUCKET_EDGES = [0, 5, 10, 20, 30, 45, 60]
+# Bucket label for every slot 0-60; slot 0 and anything outside the table fall into the last bucket.
+_BUCKET_LUT = np.array(
+    ["46-60"] + [label for label, lo, hi in zip(ORDER, BUCKET_EDGES, BUCKET_EDGES[1:]) for _ in range(lo, hi)]
+)
+
+
+MARKET_DTYPES = {"season_end": "int32", "salary": "float64", "war": "float64"}
+# war_first4 stays float64: it is the divisor of every cost-per-WAR figure.
+PICK_DTYPES = {"pick": "int16", "war_first4": "float64", "cost_first4": "float64"}
+# Bump when a prepare_* derivation changes in a way its inputs below do not capture.
+PREPARED_VERSION = 1
+MARKET_DERIVATION = f"v{PREPARED_VERSION} dtypes={MARKET_DTYPES}"
+PICK_DERIVATION = f"v{PREPARED_VERSION} dtypes={PICK_DTYPES} edges={BUCKET_EDGES}"
+
+
+T = TypeVar("T")
+
+
+def _memoize_by_identity(func: Callable[[pd.DataFrame], T]) -> Callable[[pd.DataFrame], T]:
+    """Cache `func(frame)` per frame object; frames must not be mutated after the first call."""
+    cache: Dict[int, Tuple[weakref.ref, T]] = {}
+
+    @functools.wraps(func)
+    def wrapper(frame: pd.DataFrame) -> T:
+        key = id(frame)
+        entry = cache.get(key)
+        if entry is not None and entry[0]() is frame:
+            return entry[1]
+        result = func(frame)
+        # Drop the entry when the frame is collected so a recycled id() never hits a stale result.
+        cache[key] = (weakref.ref(frame, lambda _ref, key=key: cache.pop(key, None)), result)
+        return result
+
+    return wrapper
+
+
+def assign_bucket(slot: float) -> PickBucket:
+    # Picks read from a column with gaps arrive as floats; NaN and fractional slots match no bucket.
+    slot = float(slot)
+    if slot.is_integer() and 0 <= slot < len(_BUCKET_LUT):
+        return str(_BUCKET_LUT[int(slot)])
     return "46-60"
 
 
-def prepare_salary_pricing() -> pd.DataFrame:
-    market = pd.read_csv(DATA_DIR / "salary_market_raw.csv")
-    market = market[(market["salary"] > 0) & (market["war"] > 0)]
-    market["dollars_per_war"] = market["salary"] / market["war"]
-    market = market.replace([np.inf, -np.inf], np.nan).dropna(subset=["dollars_per_war"])
-    market.to_csv(DATA_DIR / "salary_pricing_prepared.csv", index=False)
+def prepare_salary_pricing(emit_csv: bool = False) -> pd.DataFrame:
+    source = resolve_table(DATA_DIR / "salary_market_raw")
+    market = read_cached_table(DATA_DIR / "salary_pricing_prepared", source, MARKET_DERIVATION)
+    if market is None:
+        market = read_table(DATA_DIR / "salary_market_raw", columns=list(MARKET_DTYPES), dtype=MARKET_DTYPES)
+        market = market[(market["salary"] > 0) & (market["war"] > 0)]
+        market["dollars_per_war"] = market["salary"] / market["war"]
+        write_cached_table(market, DATA_DIR / "salary_pricing_prepared", source, MARKET_DERIVATION)
+    if emit_csv:
+        market.to_csv(DATA_DIR / "salary_pricing_prepared.csv", index=False)
     band = compute_band(market)
     pd.DataFrame({"quantile": list(band.keys()), "value": list(band.values())}).to_csv(
         TABLE_DIR / "salary_price_band_overall.csv", index=False
@@ -55,19 +103,30 @@ def prepare_salary_pricing() -> pd.DataFrame:
     return market
 
 
-def prepare_pick_costs() -> pd.DataFrame:
-    picks = pd.read_csv(DATA_DIR / "pick_outcomes_first4.csv")
-    picks = picks[picks["war_first4"] > 0]
-    picks["bucket"] = picks["pick"].apply(assign_bucket)
-    picks["cost_per_war_per_season"] = (picks["cost_first4"] / picks["war_first4"]) / 4.0
-    picks["war_per_season"] = picks["war_first4"] / 4.0
-    picks.to_csv(DATA_DIR / "pick_costs_prepared.csv", index=False)
+def prepare_pick_costs(emit_csv: bool = False) -> pd.DataFrame:
+    source = resolve_table(DATA_DIR / "pick_outcomes_first4")
+    picks = read_cached_table(DATA_DIR / "pick_costs_prepared", source, PICK_DERIVATION)
+    if picks is None:
+        picks = read_table(DATA_DIR / "pick_outcomes_first4", columns=list(PICK_DTYPES), dtype=PICK_DTYPES)
+        picks = picks[picks["war_first4"] > 0]
+        picks["bucket"] = pd.cut(picks["pick"], bins=BUCKET_EDGES, labels=ORDER, right=True).fillna("46-60")
+        picks["cost_per_war_per_season"] = (picks["cost_first4"] / picks["war_first4"]) / 4.0
+        picks["war_per_season"] = picks["war_first4"] / 4.0
+        write_cached_table(picks, DATA_DIR / "pick_costs_prepared", source, PICK_DERIVATION)
+    if emit_csv:
+        picks.to_csv(DATA_DIR / "pick_costs_prepared.csv", index=False)
     return picks
 
 
+@_memoize_by_identity
+def _market_quantiles(market: pd.DataFrame) -> Tuple[float, float, float]:
+    q25, q50, q75 = market["dollars_per_war"].quantile([0.25, 0.5, 0.75])
+    return q25, q50, q75
+
+
 def compute_band(market: pd.DataFrame) -> Dict[str, float]:
-    quantiles = market["dollars_per_war"].quantile([0.25, 0.5, 0.75])
-    return {"q25": quantiles.loc[0.25], "q50": quantiles.loc[0.5], "q75": quantiles.loc[0.75]}
+    q25, q50, q75 = _market_quantiles(market)
+    return {"q25": q25, "q50": q50, "q75": q75}
 
 
 def build_bucket_table(
@@ -75,28 +134,23 @@ def build_bucket_table(
     band: Dict[str, float],
     save_path: Optional[Path] = None,
 ) -> pd.DataFrame:
-    grouped = picks.groupby("bucket")
-    stats = grouped["cost_per_war_per_season"].agg(
-        median="median",
-        q25=lambda s: s.quantile(0.25),
-        q75=lambda s: s.quantile(0.75),
-    )
-    war_stats = grouped["war_first4"].agg(war_med="median")
-    cost_stats = grouped["cost_first4"].agg(cost_med="median")
-    table = stats.join(war_stats).join(cost_stats).reset_index()
+    grouped = picks.groupby("bucket", observed=True)
+    # One quantile call per group shares the sort across q25/median/q75.
+    quantiles = grouped["cost_per_war_per_season"].quantile([0.25, 0.5, 0.75]).unstack()
+    quantiles.columns = ["q25", "median", "q75"]
+    medians = grouped.agg(war_med=("war_first4", "median"), cost_med=("cost_first4", "median"))
+    table = quantiles[["median", "q25", "q75"]].join(medians).reset_index()
     table["market_q25"] = band["q25"]
     table["market_q50"] = band["q50"]
     table["market_q75"] = band["q75"]
     delta = 0.07
-
-    def zone(row: pd.Series) -> str:
-        if row["median"] < band["q25"] * (1 - delta):
-            return "BUY"
-        if row["median"] > band["q75"] * (1 + delta):
-            return "SELL"
-        return "NEUTRAL"
-
-    table["arbitrage_zone"] = table.apply(zone, axis=1)
+    median = table["median"].to_numpy()
+    zones = np.select(
+        [median < band["q25"] * (1 - delta), median > band["q75"] * (1 + delta)],
+        ["BUY", "SELL"],
+        default="NEUTRAL",
+    )
+    table["arbitrage_zone"] = pd.Categorical(zones, categories=ZONES)
     table["market_equiv_cost_4yr"] = table["war_med"] * band["q50"]
     table["surplus_4yr"] = table["market_equiv_cost_4yr"] - table["cost_med"]
     if save_path is not None:
@@ -106,9 +160,8 @@ def build_bucket_table(
 
 def format_table_for_export(table: pd.DataFrame) -> pd.DataFrame:
     table_round = table.copy()
-    for col in ["median", "q25", "q75", "market_q25", "market_q50", "market_q75"]:
-        table_round[col] = table_round[col] / 1_000_000
-    table_round["surplus_4yr"] = table_round["surplus_4yr"] / 1_000_000
+    money_cols = ["median", "q25", "q75", "market_q25", "market_q50", "market_q75", "surplus_4yr"]
+    table_round[money_cols] = table_round[money_cols].to_numpy() / 1_000_000
     table_round.rename(
         columns={
             "median": "rookie_cost_per_war_mil",
@@ -133,8 +186,11 @@ def plot_arbitrage_map(
     save_path: Optional[Path] = None,
     show_legend: bool = True,
 ) -> None:
-    table = table.set_index("bucket").loc[ORDER].reset_index()
+    table = table.sort_values("bucket").reset_index(drop=True)
     x = np.arange(len(ORDER))
+    median = table["median"].to_numpy()
+    q25 = table["q25"].to_numpy()
+    q75 = table["q75"].to_numpy()
 
     created_fig = False
     if ax is None:
@@ -151,39 +207,31 @@ def plot_arbitrage_map(
     )
     ax.axhline(band["q50"], color=BASELINE_LINE_COLOR, linestyle="--", linewidth=1.4, label="FA median $/WAR" if show_legend else None)
 
-    ax.plot(x, table["median"], color=PICK_LINE_COLOR, linewidth=2, alpha=0.85)
-    yerr = np.vstack((table["median"] - table["q25"], table["q75"] - table["median"]))
+    ax.plot(x, median, color=PICK_LINE_COLOR, linewidth=2, alpha=0.85)
+    yerr = np.vstack((median - q25, q75 - median))
     ax.errorbar(
         x,
-        table["median"],
+        median,
         yerr=yerr,
         fmt="none",
         ecolor=PICK_LINE_COLOR,
         alpha=0.45,
         capsize=5,
         linewidth=1.1,
+        rasterized=True,
     )
 
-    colors = table["arbitrage_zone"].map(ZONE_COLORS).fillna("#9e9e9e")
-    ax.scatter(x, table["median"], s=140, color=colors, edgecolor="white", linewidth=1.3, zorder=5)
+    colors = table["arbitrage_zone"].map(ZONE_COLORS).fillna("#9e9e9e").to_numpy()
+    ax.scatter(x, median, s=140, color=colors, edgecolor="white", linewidth=1.3, zorder=5, rasterized=True)
 
-    for xi, (_, row) in zip(x, table.iterrows()):
-        zone = row["arbitrage_zone"]
+    zones = table["arbitrage_zone"].to_numpy()
+    text_colors = [ZONE_TEXT_COLORS.get(zone, "#333") for zone in zones]
+    label_kwargs = dict(ha="center", va="bottom", fontsize=9, fontweight="bold", clip_on=True, transform=ax.transData)
+    for xi, yi, zone, text_color in zip(x, median * 1.05, zones, text_colors):
         if zone:
-            text_color = ZONE_TEXT_COLORS.get(zone, "#333")
-            ax.text(
-                xi,
-                row["median"] * 1.05,
-                zone,
-                ha="center",
-                va="bottom",
-                fontsize=9,
-                fontweight="bold",
-                color=text_color,
-                clip_on=True,
-            )
+            ax.text(xi, yi, zone, color=text_color, **label_kwargs)
 
-    fa_high = max(band["q75"], table["q75"].max())
+    fa_high = max(band["q75"], q75.max())
     ax.set_ylim(0, fa_high * 1.25)
     ax.set_xticks(x)
     ax.set_xticklabels(ORDER)
@@ -198,7 +246,7 @@ def plot_arbitrage_map(
     if created_fig:
         fig.tight_layout()
         if save_path is not None:
-            fig.savefig(save_path, dpi=200)
+            fig.savefig(save_path, **FIG_SAVE_KWARGS)
         plt.close(fig)
 
 
@@ -208,19 +256,20 @@ def plot_scenario_bars(
     scenario_titles: List[str],
     saves: List[Path],
 ) -> None:
-    baseline_surplus = baseline.set_index("bucket")["surplus_4yr"] / 1_000_000
+    baseline_surplus = (baseline.set_index("bucket")["surplus_4yr"] / 1_000_000).loc[ORDER].to_numpy()
     fig, axes = plt.subplots(len(scenario_tables), 1, figsize=(8, 4 * len(scenario_tables)), sharex=True)
     if len(scenario_tables) == 1:
         axes = [axes]
 
     for ax, table, title, save_path in zip(axes, scenario_tables, scenario_titles, saves):
         table = table.set_index("bucket").loc[ORDER]
-        surplus = table["surplus_4yr"] / 1_000_000
-        colors = table["arbitrage_zone"].map(ZONE_COLORS).fillna("#9e9e9e")
-        ax.barh(ORDER, surplus.loc[ORDER], color=colors.loc[ORDER], alpha=0.8)
+        surplus = (table["surplus_4yr"] / 1_000_000).to_numpy()
+        zones = table["arbitrage_zone"].to_numpy()
+        colors = table["arbitrage_zone"].map(ZONE_COLORS).fillna("#9e9e9e").to_numpy()
+        ax.barh(ORDER, surplus, color=colors, alpha=0.8, rasterized=True)
         ax.axvline(0, color="#444", linewidth=1)
-        ax.plot(baseline_surplus.loc[ORDER], ORDER, marker="o", color="#4f6cd6", linestyle="--", linewidth=1.2, label="Baseline surplus")
-        for y, val, zone in zip(ORDER, surplus.loc[ORDER], table["arbitrage_zone"].loc[ORDER]):
+        ax.plot(baseline_surplus, ORDER, marker="o", color="#4f6cd6", linestyle="--", linewidth=1.2, label="Baseline surplus")
+        for y, val, zone in zip(ORDER, surplus, zones):
             ax.text(
                 val + (0.15 if val >= 0 else -0.15),
                 y,
@@ -237,13 +286,13 @@ def plot_scenario_bars(
         ax.legend(loc="lower right", frameon=False)
     axes[-1].set_xlabel("Scenario surplus vs FA (Millions $ over 4 years)")
     fig.tight_layout()
-    fig.savefig(FIG_DIR / "figure2_arbitrage_scenarios.png", dpi=200)
+    fig.savefig(FIG_DIR / "figure2_arbitrage_scenarios.png", **FIG_SAVE_KWARGS)
     plt.close(fig)
 
 
-def main() -> None:
-    market = prepare_salary_pricing()
-    picks = prepare_pick_costs()
+def main(emit_csv: bool = False) -> None:
+    market = prepare_salary_pricing(emit_csv=emit_csv)
+    picks = prepare_pick_costs(emit_csv=emit_csv)
 
     band = compute_band(market)
     table_baseline = build_bucket_table(picks, band, save_path=TABLE_DIR / "pick_bucket_summary.csv")
@@ -251,21 +300,23 @@ def main() -> None:
     format_table_for_export(table_baseline).to_csv(TABLE_DIR / "table1_arbitrage_summary.csv", index=False)
 
     season_medians = market.groupby("season_end")["dollars_per_war"].median()
-    high_threshold = season_medians.quantile(0.75)
-    low_threshold = season_medians.quantile(0.25)
-    high_seasons = season_medians[season_medians >= high_threshold].index.tolist()
-    low_seasons = season_medians[season_medians <= low_threshold].index.tolist()
+    median_values = season_medians.to_numpy()
+    low_threshold, high_threshold = np.quantile(median_values, [0.25, 0.75])
+    season_keys = season_medians.index.to_numpy()
+    high_seasons = season_keys[median_values >= high_threshold]
+    low_seasons = season_keys[median_values <= low_threshold]
+    market_seasons = market["season_end"].to_numpy()
 
     scenario_specs = []
     scenario_titles = []
     scenario_paths = []
 
-    market_high = market[market["season_end"].isin(high_seasons)]
+    market_high = market[np.isin(market_seasons, high_seasons)]
     if not market_high.empty:
         scenario_specs.append(compute_band(market_high))
         scenario_titles.append("Thin FA class (top quartile)")
         scenario_paths.append(TABLE_DIR / "table_scenario_thin.csv")
-    market_low = market[market["season_end"].isin(low_seasons)]
+    market_low = market[np.isin(market_seasons, low_seasons)]
     if not market_low.empty:
         scenario_specs.append(compute_band(market_low))
         scenario_titles.append("Deep FA class (bottom quartile)")
@@ -275,15 +326,23 @@ def main() -> None:
     scenario_titles.append("Second apron pressure (+10% FA $/WAR)")
     scenario_paths.append(TABLE_DIR / "table_scenario_apron.csv")
 
-    scenario_tables = []
-    for spec, path in zip(scenario_specs, scenario_paths):
+    def build_scenario(spec: Dict[str, float], path: Path) -> pd.DataFrame:
         table = build_bucket_table(picks, spec, save_path=path)
         formatted_path = path.with_name(path.stem + "_formatted" + path.suffix)
         format_table_for_export(table).to_csv(formatted_path, index=False)
-        scenario_tables.append(table)
+        return table
+
+    with ThreadPoolExecutor(max_workers=len(scenario_specs)) as executor:
+        scenario_tables = list(executor.map(build_scenario, scenario_specs, scenario_paths))
 
     plot_scenario_bars(table_baseline, scenario_tables, scenario_titles, scenario_paths)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--emit-csv",
+        action="store_true",
+        help="also write the prepared salary/pick tables to data/*_prepared.csv",
+    )
+    main(emit_csv=parser.parse_args().emit_csv)
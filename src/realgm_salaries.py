@@ -3,10 +3,13 @@ from __future__ import annotations
 
 import re
 from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, Iterable
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
 
 import pandas as pd
-import requests
+from lxml import html as lxhtml
+
+from http_session import last_completed_season, request_with_retry
 
 TEAM_IDS: Dict[str, str] = {
     "ATL": "atlanta-hawks",
@@ -76,6 +79,7 @@ TEAM_META: Dict[str, int] = {
 
 BASE_URL = "https://basketball.realgm.com/nba/teams/{slug}/{tid}/Rosters/{season}"
 MONEY_RE = re.compile(r"[^0-9.]")
+CACHE_DIR = Path("data") / "cache" / "realgm"
 
 
 def _clean_money(value: str) -> float:
@@ -87,43 +91,72 @@ def _clean_money(value: str) -> float:
     return float(cleaned)
 
 
-def fetch_team_salaries(team_abbr: str, season_end: int) -> pd.DataFrame:
+def _fetch_roster_html(team_abbr: str, season_end: int, refresh: bool = False) -> str:
     slug = TEAM_IDS[team_abbr]
     team_id = TEAM_META[team_abbr]
     url = BASE_URL.format(slug=slug, tid=team_id, season=season_end)
-    response = requests.get(url, timeout=30)
-    response.raise_for_status()
-    tables = pd.read_html(response.text)
-    salary_table = None
-    for table in tables:
-        if "Salary" in table.columns:
-            salary_table = table
-            break
-    if salary_table is None:
-        return pd.DataFrame(columns=["player", "team", "season_end", "salary"])
+    return request_with_retry(url, raise_on_failure=True, refresh=refresh).text
+
+
+def _cell_text(cell: lxhtml.HtmlElement) -> str:
+    """Return the cell's text with internal whitespace runs collapsed to single spaces."""
+    return " ".join(cell.text_content().split())
+
+
+def _parse_salary_html(html: str, team_abbr: str, season_end: int) -> pd.DataFrame:
+    """Build the salary frame from the roster table that has a "Salary" header."""
+    empty = pd.DataFrame(columns=["player", "team", "season_end", "salary"])
+    tables = lxhtml.fromstring(html).xpath('//table[.//th[normalize-space()="Salary"]]')
+    if not tables:
+        return empty
+    table = tables[0]
+    headers = [_cell_text(th) for th in table.xpath("(.//tr[th])[1]/th")]
+    rows = [[_cell_text(cell) for cell in tr.xpath("./th|./td")] for tr in table.xpath(".//tr[td]")]
+    salary_table = pd.DataFrame([row for row in rows if len(row) == len(headers)], columns=headers)
     salary_table = salary_table.rename(columns={"Player": "player"})
-    if "player" not in salary_table.columns or "Salary" not in salary_table.columns:
-        return pd.DataFrame(columns=["player", "team", "season_end", "salary"])
-    salary_table["Salary"] = salary_table["Salary"].astype(str).apply(_clean_money)
+    if "player" not in salary_table.columns:
+        return empty
+    salary_table["Salary"] = (
+        salary_table["Salary"].astype(str).str.replace(MONEY_RE, "", regex=True).replace("", "0").astype(float)
+    )
     salary_table["team"] = team_abbr
     salary_table["season_end"] = season_end
     return salary_table[["player", "team", "season_end", "Salary"]]
 
 
-def get_league_salaries(season_end: int) -> pd.DataFrame:
+def fetch_team_salaries(team_abbr: str, season_end: int, refresh: bool = False) -> pd.DataFrame:
+    """Return a team's roster salaries, read from the on-disk page cache unless `refresh` is set."""
+    cache_path = CACHE_DIR / str(season_end) / f"{team_abbr}.html"
+    if cache_path.exists() and not refresh:
+        return _parse_salary_html(cache_path.read_text(encoding="utf-8"), team_abbr, season_end)
+    html = _fetch_roster_html(team_abbr, season_end, refresh=refresh)
+    salary_table = _parse_salary_html(html, team_abbr, season_end)
+    # Only finished rosters are pinned on disk; other pages (in-progress seasons, pages without
+    # the salary table) are left to the HTTP cache's 30-day expiry.
+    if not salary_table.empty and season_end <= last_completed_season():
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(html, encoding="utf-8")
+    return salary_table
+
+
+def get_league_salaries(season_end: int, refresh: bool = False) -> pd.DataFrame:
     teams: Iterable[str] = TEAM_IDS.keys()
-    with ThreadPoolExecutor(max_workers=8) as executor:
-        frames = list(executor.map(lambda abbr: fetch_team_salaries(abbr, season_end), teams))
-    if not frames:
-        return pd.DataFrame(columns=["player", "season_end", "salary"])
-    combined = pd.concat(frames, ignore_index=True)
-    if combined.empty:
-        return pd.DataFrame(columns=["player", "season_end", "salary"])
-    combined = (
-        combined.groupby(["player", "season_end"], as_index=False)["Salary"].max()
-        .rename(columns={"Salary": "salary"})
+    # One worker per team so every roster is in flight at once; http_session.POOL_SIZE covers them all.
+    with ThreadPoolExecutor(max_workers=len(TEAM_IDS)) as executor:
+        frames = list(executor.map(lambda abbr: fetch_team_salaries(abbr, season_end, refresh=refresh), teams))
+    # Players may appear on several rosters (trades/10-days); keep the max salary per season.
+    best: Dict[Tuple[str, int], float] = {}
+    for frame in frames:
+        if frame.empty:
+            continue
+        for player, season, salary in zip(frame["player"], frame["season_end"], frame["Salary"]):
+            key = (player, season)
+            best[key] = max(best.get(key, 0.0), salary)
+    combined = pd.DataFrame.from_records(
+        [(player, season, salary) for (player, season), salary in best.items()],
+        columns=["player", "season_end", "salary"],
     )
-    return combined
+    return combined.sort_values(["player", "season_end"], ignore_index=True)
 
 
 __all__ = ["get_league_salaries", "fetch_team_salaries"]
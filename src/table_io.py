@@ -0,0 +1,91 @@
+"""Read and write pipeline tables as Parquet, falling back to CSV without pyarrow."""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional; CSV is always available
+    pq = None
+
+
+def _newest(*paths: Path) -> Optional[Path]:
+    existing = [path for path in paths if path.exists()]
+    if not existing:
+        return None
+    return max(existing, key=lambda path: path.stat().st_mtime_ns)
+
+
+def resolve_table(path: Path) -> Path:
+    """Return the file `read_table` would load for `path`."""
+    parquet_path = path.with_suffix(".parquet")
+    csv_path = path.with_suffix(".csv")
+    source = _newest(parquet_path, csv_path) if pq is not None else csv_path
+    if source is None:
+        raise FileNotFoundError(f"Neither {parquet_path} nor {csv_path} exists")
+    return source
+
+
+def _signature(source: Path, derivation: str) -> str:
+    stat = source.stat()
+    return f"{derivation}|{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def read_cached_table(path: Path, source: Path, derivation: str) -> Optional[pd.DataFrame]:
+    """Return the Parquet table derived from `source`, or None if it is missing or stale.
+
+    `derivation` identifies how the table was built from `source`; a cache written
+    under a different derivation is treated as stale.
+    """
+    parquet_path = path.with_suffix(".parquet")
+    sig_path = path.with_suffix(".sig")
+    if pq is None or not parquet_path.exists() or not sig_path.exists():
+        return None
+    if sig_path.read_text().strip() != _signature(source, derivation):
+        return None
+    return pd.read_parquet(parquet_path)
+
+
+def write_cached_table(df: pd.DataFrame, path: Path, source: Path, derivation: str) -> None:
+    """Store `df` as Parquet alongside the signature of its `source` and `derivation`."""
+    if pq is None:
+        return
+    df.to_parquet(path.with_suffix(".parquet"), index=False, compression="snappy")
+    path.with_suffix(".sig").write_text(_signature(source, derivation))
+
+
+def write_table(df: pd.DataFrame, path: Path) -> Path:
+    """Write `df` next to `path` as snappy Parquet (or CSV) and return the file written."""
+    if pq is None:
+        out_path = path.with_suffix(".csv")
+        df.to_csv(out_path, index=False)
+    else:
+        out_path = path.with_suffix(".parquet")
+        df.to_parquet(out_path, index=False, compression="snappy")
+    return out_path
+
+
+def read_table(
+    path: Path,
+    columns: Optional[Sequence[str]] = None,
+    dtype: Optional[Dict[str, str]] = None,
+) -> pd.DataFrame:
+    """Read the newer of `path`'s Parquet and CSV versions.
+
+    `columns` lists the wanted columns; names missing from the file are ignored.
+    """
+    source = resolve_table(path)
+    if source.suffix == ".parquet":
+        names = pq.read_schema(source).names
+        df = pd.read_parquet(source, columns=[c for c in columns if c in names] if columns else None)
+        return df.astype({k: v for k, v in (dtype or {}).items() if k in df.columns})
+    # The default C parser is kept on purpose: pyarrow's parser rounds some floats one ulp differently,
+    # which would change the published tables derived from the committed CSV snapshots.
+    usecols = (lambda column: column in columns) if columns else None
+    return pd.read_csv(source, usecols=usecols, dtype=dtype)
+
+
+__all__ = ["read_cached_table", "read_table", "resolve_table", "write_cached_table", "write_table"]
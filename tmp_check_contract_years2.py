@@ -1,13 +1,14 @@
 import requests
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+retry = Retry(total=6, backoff_factor=2, status_forcelist=[429, 500, 502, 503, 504])
+session = requests.Session()
+session.mount("https://", HTTPAdapter(max_retries=retry))
 year = 2024
 url = f"https://www.basketball-reference.com/contracts/players-{year}.html"
-for attempt in range(6):
-    res = requests.get(url, headers=headers, timeout=30)
-    print(year, attempt, res.status_code)
-    if res.status_code != 429:
-        print(len(res.text))
-        open(f'contracts_{year}.html','w',encoding='utf-8').write(res.text)
-        break
-    time.sleep(2*(attempt+1))
+res = session.get(url, headers=headers, timeout=30)
+print(year, res.status_code)
+if res.ok:
+    print(len(res.text))
+    open(f'contracts_{year}.html','w',encoding='utf-8').write(res.text)